@@ -2,9 +2,14 @@ from . import inosmi_ru
 from . import dvmn_org
 from .exceptions import ArticleNotFound
 
-__all__ = ['SANITIZERS', 'ArticleNotFound']
+__all__ = ['SANITIZERS', 'BATCH_SANITIZERS', 'ArticleNotFound']
 
 SANITIZERS = {
     'inosmi_ru': inosmi_ru.sanitize,
     'dvmn_org': dvmn_org.sanitize,
 }
+
+BATCH_SANITIZERS = {
+    'inosmi_ru': inosmi_ru.sanitize_many,
+    'dvmn_org': dvmn_org.sanitize_many,
+}
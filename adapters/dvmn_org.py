@@ -1,2 +1,6 @@
 def sanitize(resp, *args, **kwargs):
     return resp, 'Книга'
+
+
+def sanitize_many(resps, *args, **kwargs):
+    return [sanitize(resp) for resp in resps]
@@ -1,4 +1,5 @@
 from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder
 import requests
 import pytest
 
@@ -7,7 +8,19 @@ from .html_tools import remove_buzz_attrs, remove_buzz_tags, remove_all_tags
 
 
 def sanitize(html, plaintext=False):
-    soup = BeautifulSoup(html, 'html.parser')
+    return _sanitize_soup(BeautifulSoup(html, 'html.parser'), plaintext)
+
+
+def sanitize_many(htmls, plaintext=False):
+    """Разбирает пачку страниц, переиспользуя один построитель дерева."""
+    builder = HTMLParserTreeBuilder()
+    return [
+        _sanitize_soup(BeautifulSoup(html, builder=builder), plaintext)
+        for html in htmls
+    ]
+
+
+def _sanitize_soup(soup, plaintext=False):
     articles = soup.select('article.article')
 
     if len(articles) != 1:
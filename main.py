@@ -1,23 +1,55 @@
 import aiohttp
 import asyncio
 import contextlib
+from dataclasses import dataclass
 from enum import Enum
 import functools
 import logging
-from os import listdir
-from os.path import isfile, join
+import pathlib
 from urllib.parse import urlparse
 
 from aiohttp import web
-import aionursery
-from async_timeout import timeout
+from cachetools import TTLCache
 import pymorphy2
 
+try:
+    from asyncio import timeout  # Python >= 3.11
+except ImportError:
+    from async_timeout import timeout
+
+try:
+    import charset_normalizer
+except ImportError:
+    charset_normalizer = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 import adapters
+import text_tools
 from text_tools import calculate_jaundice_rate
 from time_measurement import measure_exec_time
 
 
+MAX_CONNECTIONS = 100
+MAX_CONNECTIONS_PER_HOST = 10
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 30
+FETCH_CHUNK_SIZE = 65536
+MAX_CONCURRENT_FETCHES = 20
+ARTICLE_CACHE_SIZE = 512
+ARTICLE_CACHE_TTL = 600
+
+# url -> (etag, last_modified, article_info) для условных GET-запросов.
+_article_cache = TTLCache(maxsize=ARTICLE_CACHE_SIZE, ttl=ARTICLE_CACHE_TTL)
+
 TEST_ARTICLES = [
     'https://url_does_not_exist.ru',
     'https://lenta.ru/news/2019/10/15/real/',
@@ -37,10 +69,25 @@ class ProcessingStatus(Enum):
     TIMEOUT = 'TIMEOUT'
 
 
-def get_sanitizer(url):
-    domain_name = urlparse(url).netloc
-    sanitizer_name = '_'.join(domain_name.split('.'))
-    sanitizer = adapters.SANITIZERS.get(sanitizer_name)
+@dataclass(slots=True)
+class ArticleInfo:
+    url: str
+    title: str | None = None
+    status: str | None = None
+    score: float | None = None
+    words_count: int | None = None
+    exec_time: float | None = None
+
+
+_SANITIZER_BY_NETLOC = {
+    sanitizer_name.replace('_', '.'): sanitizer
+    for sanitizer_name, sanitizer in adapters.SANITIZERS.items()
+}
+
+
+@functools.lru_cache(maxsize=128)
+def _sanitizer_for_domain(domain_name):
+    sanitizer = _SANITIZER_BY_NETLOC.get(domain_name)
 
     if sanitizer:
         return sanitizer
@@ -48,146 +95,224 @@ def get_sanitizer(url):
     raise adapters.ArticleNotFound(f'Статья на {domain_name}')
 
 
-@contextlib.asynccontextmanager
-async def create_handy_nursery():
-    try:
-        async with aionursery.Nursery() as nursery:
-            yield nursery
-    except aionursery.MultiError as e:
-        if len(e.exceptions) == 1:
-            raise e.exceptions[0]
-        raise
+def get_sanitizer(url):
+    return _sanitizer_for_domain(urlparse(url).netloc)
 
 
+@functools.lru_cache(maxsize=8)
 def get_charged_words(path):
+    """Читает словари "заряженных" слов одним синхронным проходом.
+
+    Результат кэшируется по пути: файлы читаются один раз на процесс.
+    Для CLI-сценария достаточно обернуть первый вызов в asyncio.to_thread,
+    отдельная aiofiles-обвязка не нужна.
+    """
     words = []
-    files = [join(path, fn) for fn in listdir(path) if isfile(join(path, fn))]
-    for file in files:
-        with open(file, mode='r') as fp:
-            contents = fp.read()
-            words.extend(contents.strip().split('\n'))
-    return words
+    for file_path in sorted(pathlib.Path(path).glob('*.txt')):
+        words.extend(file_path.read_bytes().decode('utf-8').splitlines())
+    return frozenset(word.strip().lower() for word in words if word.strip())
+
+
+def warm_up(morph):
+    """Прогревает ленивые кэши до первого запроса.
+
+    MorphAnalyzer дозагружает словари при первом parse(), а адаптеры
+    лениво инициализируют парсер HTML; без прогрева эту цену платит
+    первая статья.
+    """
+    for word in ('тест', 'наука', 'статья'):
+        morph.parse(word)
+
+    for sanitize in adapters.SANITIZERS.values():
+        try:
+            sanitize('<html></html>', plaintext=True)
+        except adapters.ArticleNotFound:
+            pass
+
 
+def _decode_body(data, charset):
+    """Декодирует тело ответа, не роняя статью на кривой кодировке.
+
+    Сначала заявленная кодировка (или UTF-8), при неудаче — определение
+    кодировки по содержимому (cp1251 до сих пор встречается у российских
+    новостных сайтов), в крайнем случае — замена некодируемых байтов.
+    """
+    try:
+        return data.decode(charset or 'utf-8')
+    except (UnicodeDecodeError, LookupError):
+        pass
+
+    if charset_normalizer is not None:
+        best_guess = charset_normalizer.from_bytes(bytes(data)).best()
+        if best_guess is not None:
+            return str(best_guess)
+
+    return data.decode('utf-8', errors='replace')
+
+
+async def fetch(session, url, cached=None):
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+    async with session.get(url, headers=headers) as response:
+        if cached and response.status == 304:
+            return None, None
 
-async def fetch(session, url):
-    async with session.get(url) as response:
         response.raise_for_status()
-        return await response.text()
+        data = bytearray()
+        async for chunk in response.content.iter_chunked(FETCH_CHUNK_SIZE):
+            data.extend(chunk)
+        validators = (
+            response.headers.get('ETag'),
+            response.headers.get('Last-Modified'),
+        )
+        return _decode_body(data, response.charset), validators
 
 
-async def process_article(session, morph, charged_words, url, resp_timeout=5):
-    article_info = {
-        'url': url,
-        'title': None,
-        'status': None,
-        'score': None,
-        'words_count': None,
-        'exec_time': None
-    }
+async def process_article(session, morph, charged_words, url,
+                          resp_timeout=5, fetch_semaphore=None):
+    article_info = ArticleInfo(url=url)
+    cached = _article_cache.get(url)
 
     try:
-        async with timeout(resp_timeout):
-            article_html = await fetch(session, url)
-            adapter = get_sanitizer(url)
+        # Семафор берётся до таймаута: ожидание в очереди за другими
+        # загрузками не должно съедать бюджет самой загрузки.
+        async with fetch_semaphore or contextlib.nullcontext():
+            async with timeout(resp_timeout):
+                article_html, validators = await fetch(session, url, cached)
+        if article_html is None:
+            # 304 Not Modified: содержимое не менялось, отдаём
+            # сохранённый результат без разбора и оценки.
+            return cached[2]
+        adapter = get_sanitizer(url)
 
     except aiohttp.ClientError:
-        article_info.update({
-            'title': 'URL does not exist',
-            'status': ProcessingStatus.FETCH_ERROR.value
-        })
+        article_info.title = 'URL does not exist'
+        article_info.status = ProcessingStatus.FETCH_ERROR.value
 
     except adapters.ArticleNotFound as err:
-        article_info.update({
-            'title': str(err),
-            'status': ProcessingStatus.PARSING_ERROR.value
-        })
+        article_info.title = str(err)
+        article_info.status = ProcessingStatus.PARSING_ERROR.value
 
     except asyncio.TimeoutError:
-        article_info.update({
-            'title': 'Timeout Error',
-            'status': ProcessingStatus.TIMEOUT.value
-        })
+        article_info.title = 'Timeout Error'
+        article_info.status = ProcessingStatus.TIMEOUT.value
 
     else:
         text, title = adapter(article_html, plaintext=True)
         async with measure_exec_time(morph, text) as (exec_time, words, err):
+            article_info.title = title
             if err:
-                article_info.update({
-                    'title': title,
-                    'status': ProcessingStatus.TIMEOUT.value,
-                })
+                article_info.status = ProcessingStatus.TIMEOUT.value
             else:
-                score = calculate_jaundice_rate(words, charged_words)
-                article_info.update({
-                    'title': title,
-                    'status': ProcessingStatus.OK.value,
-                    'score': score,
-                    'words_count': len(words),
-                })
-            article_info.update({'exec_time': exec_time})
+                article_info.status = ProcessingStatus.OK.value
+                article_info.score = calculate_jaundice_rate(
+                    words, charged_words)
+                article_info.words_count = len(words)
+                if validators and any(validators):
+                    _article_cache[url] = (*validators, article_info)
+            article_info.exec_time = exec_time
 
     return article_info
 
 
-async def get_articles_analysis_results(morph, charged_words, urls):
-    tasks = []
+async def create_session(app):
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONNECTIONS,
+        limit_per_host=MAX_CONNECTIONS_PER_HOST,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+    )
+    app['session'] = aiohttp.ClientSession(connector=connector)
 
-    async with aiohttp.ClientSession() as session:
-        async with create_handy_nursery() as nursery:
-            for url in urls:
-                task = nursery.start_soon(
-                    process_article(
-                        session,
-                        morph,
-                        charged_words,
-                        url,
-                    )
-                )
-                tasks.append(task)
 
-    done, _ = await asyncio.wait(tasks)
+async def close_session(app):
+    await app['session'].close()
 
-    return [task.result() for task in done]
+
+async def get_articles_analysis_results(session, morph, charged_words, urls,
+                                        fetch_semaphore=None):
+    results = []
+    if fetch_semaphore is None:
+        fetch_semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+    async with asyncio.TaskGroup() as task_group:
+        tasks = [
+            task_group.create_task(
+                process_article(
+                    session,
+                    morph,
+                    charged_words,
+                    url,
+                    fetch_semaphore=fetch_semaphore,
+                )
+            )
+            for url in urls
+        ]
+        for future in asyncio.as_completed(tasks):
+            results.append(await future)
+
+    return results
 
 
 def prepare_response(data):
-    response_fields = ('status', 'url', 'score', 'words_count')
-    response = [
+    return [
         {
-            key: value for key, value in entry.items()
-            if key in response_fields
+            'status': article.status,
+            'url': article.url,
+            'score': article.score,
+            'words_count': article.words_count,
         }
-        for entry in data
+        for article in data
     ]
-    return response
 
 
-async def handle_http_request(morph, charged_words, request):
+def json_response(data, status=200):
+    if orjson is not None:
+        return web.Response(
+            body=orjson.dumps(data),
+            status=status,
+            content_type='application/json',
+        )
+    return web.json_response(data, status=status)
+
+
+async def handle_http_request(request):
     urls = request.query.get('urls')
 
     if not urls:
-        return web.json_response({"error": "bad request"}, status=400)
+        return json_response({"error": "bad request"}, status=400)
 
     urls_list = urls.split(',')
 
     if len(urls_list) > 10:
-        return web.json_response(
+        return json_response(
             {"error": "too many urls in request, should be 10 or less"},
             status=400
         )
 
     results = await get_articles_analysis_results(
-        morph,
-        charged_words,
-        urls_list
+        request.app['session'],
+        request.app['morph'],
+        request.app['charged_words'],
+        urls_list,
+        fetch_semaphore=request.app['fetch_semaphore'],
     )
 
     response_data = prepare_response(results)
 
-    return web.json_response(response_data)
+    return json_response(response_data)
 
 
 def main():
+    if uvloop is not None:
+        uvloop.install()
+
     logging.basicConfig(level=logging.INFO)
     logging.getLogger('asyncio').setLevel(logging.WARNING)
     logging.getLogger('pymorphy2').setLevel(logging.WARNING)
@@ -196,16 +321,22 @@ def main():
     charged_words = get_charged_words(path)
 
     morph = pymorphy2.MorphAnalyzer()
+    text_tools.init_morph(morph)
+    warm_up(morph)
 
     app = web.Application()
+    app['morph'] = morph
+    app['charged_words'] = charged_words
+    # Общий лимит на процесс, а не на запрос: иначе при лимите в 10 URL
+    # на запрос пер-батчевый семафор никогда бы не срабатывал.
+    app['fetch_semaphore'] = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    app.on_startup.append(create_session)
+    app.on_cleanup.append(close_session)
     app.add_routes([
-        web.get(
-            '/',
-            functools.partial(handle_http_request, morph, charged_words)
-        )
+        web.get('/', handle_http_request)
     ])
 
-    web.run_app(app)
+    web.run_app(app, access_log=None)
 
 
 if __name__ == '__main__':
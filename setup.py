@@ -0,0 +1,18 @@
+from setuptools import Extension, setup
+
+from Cython.Build import cythonize
+
+setup(
+    name='async-news-filter-speedups',
+    ext_modules=cythonize(
+        [
+            Extension(
+                'text_tools_c',
+                ['text_tools_c.pyx'],
+                extra_compile_args=['-O3'],
+            ),
+        ],
+        language_level=3,
+        annotate=True,
+    ),
+)
@@ -0,0 +1,25 @@
+import asyncio
+
+import pymorphy2
+import pytest
+
+from main import get_charged_words
+
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+@pytest.fixture(scope='session')
+def morph():
+    # Экземпляры MorphAnalyzer занимают 10-15Мб RAM т.к. загружают в память
+    # много данных, поэтому создаём один анализатор на всю тестовую сессию.
+    return pymorphy2.MorphAnalyzer()
+
+
+@pytest.fixture(scope='session')
+def charged_words():
+    charged_dict_path = 'charged_dict'
+    return get_charged_words(charged_dict_path)
@@ -1,9 +1,10 @@
 import pytest
 import requests
 
-from adapters import ArticleNotFound, SANITIZERS
+from adapters import ArticleNotFound, BATCH_SANITIZERS, SANITIZERS
 
 sanitize = SANITIZERS.get('inosmi_ru')
+sanitize_many = BATCH_SANITIZERS.get('inosmi_ru')
 
 
 def test_sanitize():
@@ -32,6 +33,23 @@ def test_sanitize():
     assert '<h1>' not in clean_plaintext
 
 
+def test_sanitize_many():
+    htmls = [
+        f"""
+            <h1 class="article-header__title">Заголовок {number}</h1>
+            <article class="article">Текст статьи номер {number}.</article>
+        """
+        for number in range(3)
+    ]
+
+    results = sanitize_many(htmls, plaintext=True)
+
+    assert results == [sanitize(html, plaintext=True) for html in htmls]
+    for number, (text, title) in enumerate(results):
+        assert title == f'Заголовок {number}'
+        assert text == f'Текст статьи номер {number}.'
+
+
 def test_sanitize_wrong_url():
     resp = requests.get('http://example.com')
     resp.raise_for_status()
@@ -1,34 +1,24 @@
 import asyncio
+from unittest.mock import AsyncMock, patch
 from urllib.parse import urlparse
 
 import aiohttp
-import asynctest
 import pytest
-import pymorphy2
 
 from main import (
     process_article,
+    get_articles_analysis_results,
     get_sanitizer,
-    get_charged_words,
-    ProcessingStatus
+    ArticleInfo,
+    ProcessingStatus,
+    MAX_CONCURRENT_FETCHES
 )
 from adapters import ArticleNotFound
 
 
-@pytest.fixture()
-def charged_words():
-    charged_dict_path = 'charged_dict'
-    return get_charged_words(charged_dict_path)
-
-
-@pytest.fixture()
-def morph():
-    return pymorphy2.MorphAnalyzer()
-
-
 @pytest.fixture()
 def session_mock():
-    return asynctest.CoroutineMock()
+    return AsyncMock()
 
 
 @pytest.fixture()
@@ -36,22 +26,12 @@ def url_nonexistent_adapter():
     return 'https://example.ru'
 
 
-@pytest.fixture
-async def fetch_mock(*args):
-    coro_mock = asynctest.CoroutineMock()
-    coro_mock.return_value = """
+@pytest.fixture()
+def fetch_mock():
+    return AsyncMock(return_value=("""
         <h1 class="article-header__title">Test article title</h1>
         <article class="article">Some kind of text.</article>
-    """
-    return coro_mock
-
-
-async def mock_client_error(*args):
-    raise aiohttp.ClientError
-
-
-async def mock_timeout_error(*args):
-    raise asyncio.TimeoutError
+    """, None))
 
 
 def test_article_not_found_raises(url_nonexistent_adapter):
@@ -67,17 +47,13 @@ async def test_nonexistent_adapter(
     url = url_nonexistent_adapter
     domain_name = urlparse(url).netloc
 
-    expected_data = {
-        'url': url,
-        'title': f'Статья на {domain_name}',
-        'status': ProcessingStatus.PARSING_ERROR.value,
-        'score': None,
-        'words_count': None,
-        'exec_time': None
+    expected_data = ArticleInfo(
+        url=url,
+        title=f'Статья на {domain_name}',
+        status=ProcessingStatus.PARSING_ERROR.value,
+    )
 
-    }
-
-    with asynctest.patch('main.fetch', side_effect=fetch_mock):
+    with patch('main.fetch', fetch_mock):
         result = await process_article(session_mock, morph, charged_words, url)
         assert result == expected_data
 
@@ -86,17 +62,13 @@ async def test_nonexistent_adapter(
 async def test_fetch_client_error(session_mock, morph, charged_words):
     url = 'https://url_does_not_exist.ru'
 
-    expected_data = {
-        'url': url,
-        'title': 'URL does not exist',
-        'status': ProcessingStatus.FETCH_ERROR.value,
-        'score': None,
-        'words_count': None,
-        'exec_time': None
-
-    }
+    expected_data = ArticleInfo(
+        url=url,
+        title='URL does not exist',
+        status=ProcessingStatus.FETCH_ERROR.value,
+    )
 
-    with asynctest.patch('main.fetch', side_effect=mock_client_error):
+    with patch('main.fetch', AsyncMock(side_effect=aiohttp.ClientError)):
         result = await process_article(session_mock, morph, charged_words, url)
         assert result == expected_data
 
@@ -105,28 +77,75 @@ async def test_fetch_client_error(session_mock, morph, charged_words):
 async def test_fetch_timeout_error(session_mock, morph, charged_words):
     url = 'https://inosmi.ru/'
 
-    expected_data = {
-        'url': url,
-        'title': 'Timeout Error',
-        'status': ProcessingStatus.TIMEOUT.value,
-        'score': None,
-        'words_count': None,
-        'exec_time': None
-
-    }
+    expected_data = ArticleInfo(
+        url=url,
+        title='Timeout Error',
+        status=ProcessingStatus.TIMEOUT.value,
+    )
 
-    with asynctest.patch('main.fetch', side_effect=mock_timeout_error):
+    with patch('main.fetch', AsyncMock(side_effect=asyncio.TimeoutError)):
         result = await process_article(session_mock, morph, charged_words, url)
         assert result == expected_data
 
 
+@pytest.mark.asyncio
+async def test_shared_session_across_batch(morph, charged_words):
+    sessions_seen = []
+
+    async def fake_fetch(session, *args):
+        sessions_seen.append(session)
+        raise aiohttp.ClientError
+
+    session = object()
+    urls = ['https://url1.ru', 'https://url2.ru', 'https://url3.ru']
+
+    with patch('main.fetch', fake_fetch):
+        results = await get_articles_analysis_results(
+            session, morph, charged_words, urls)
+
+    assert len(sessions_seen) == len(urls)
+    assert all(seen is session for seen in sessions_seen)
+    assert {result.url for result in results} == set(urls)
+    assert all(
+        result.status == ProcessingStatus.FETCH_ERROR.value
+        for result in results
+    )
+
+
+@pytest.mark.asyncio
+async def test_fan_out_stays_bounded(morph, charged_words):
+    active_fetches = 0
+    max_active_fetches = 0
+
+    async def fake_fetch(session, url, cached=None):
+        nonlocal active_fetches, max_active_fetches
+        active_fetches += 1
+        max_active_fetches = max(max_active_fetches, active_fetches)
+        await asyncio.sleep(0)
+        active_fetches -= 1
+        raise aiohttp.ClientError
+
+    urls = [f'https://url{number}.ru' for number in range(50)]
+
+    with patch('main.fetch', fake_fetch):
+        results = await get_articles_analysis_results(
+            object(), morph, charged_words, urls)
+
+    assert {result.url for result in results} == set(urls)
+    assert all(
+        result.status == ProcessingStatus.FETCH_ERROR.value
+        for result in results
+    )
+    assert max_active_fetches <= MAX_CONCURRENT_FETCHES
+
+
 @pytest.mark.asyncio
 async def test_success_process_article(
         fetch_mock, session_mock, morph, charged_words):
     url = 'https://inosmi.ru'
-    with asynctest.patch('main.fetch', side_effect=fetch_mock):
+    with patch('main.fetch', fetch_mock):
         result = await process_article(session_mock, morph, charged_words, url)
-        assert result['url'] == 'https://inosmi.ru'
-        assert result['title'] == 'Test article title'
-        assert result['status'] == ProcessingStatus.OK.value
-        assert result['words_count'] == 3
+        assert result.url == 'https://inosmi.ru'
+        assert result.title == 'Test article title'
+        assert result.status == ProcessingStatus.OK.value
+        assert result.words_count == 3
@@ -1,16 +1,9 @@
 import asyncio
 
-import pymorphy2
-
 from text_tools import split_by_words, calculate_jaundice_rate
 
 
-def test_split_by_words():
-    # Экземпляры MorphAnalyzer занимают 10-15Мб RAM т.к. загружают в память много данных
-    # Старайтесь ораганизовать свой код так, чтоб создавать экземпляр
-    # MorphAnalyzer заранее и в единственном числе
-    morph = pymorphy2.MorphAnalyzer()
-
+def test_split_by_words(morph):
     words = asyncio.run(split_by_words(morph, 'Во-первых, он хочет, чтобы'))
 
     assert words == ['во-первых', 'хотеть', 'чтобы']
@@ -1,37 +1,214 @@
 import asyncio
-import string
+import re
 
 import pymorphy2
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def _clean_word(word):
-    word = word.replace('«', '').replace('»', '').replace('…', '')
-    # FIXME какие еще знаки пунктуации часто встречаются ?
-    word = word.strip(string.punctuation)
-    return word
+try:
+    import numba
+except ImportError:
+    numba = None
 
+try:
+    import text_tools_c
+except ImportError:
+    text_tools_c = None
 
-async def split_by_words(morph, text):
-    """Учитывает знаки пунктуации, регистр и словоформы, выкидывает предлоги."""
+
+_NORMAL_FORM_CACHE_SIZE = 200000
+
+_morph = None
+_normal_forms = {}
+_charged_ids_by_set = {}
+
+
+def init_worker_morph():
+    """Создаёт по одному MorphAnalyzer в каждом процессе-воркере пула."""
+    init_morph(pymorphy2.MorphAnalyzer())
+
+
+def analyze_text(text):
+    """Синхронный разбор текста; выполняется внутри процесса-воркера."""
+    return _split_by_words_sync(_morph, text)
+
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _count_charged(ids):
+        count = 0
+        for index in range(ids.size):
+            if ids[index] >= 0:
+                count += 1
+        return count
+
+    # Прогреваем JIT при импорте, чтобы первая статья не платила за компиляцию.
+    _count_charged(np.zeros(1, dtype=np.int32))
+
+
+_BLOOM_SEEDS = (0, 1, 2)
+_BLOOM_BITS_PER_WORD = 16
+
+_bloom_by_set = {}
+
+
+class BloomFilter:
+    """Компактный фильтр Блума на целочисленной битовой маске.
+
+    Отсекает заведомо незаряженные слова несколькими проверками битов,
+    не трогая хэш-таблицу словаря; ложноотрицательных срабатываний нет.
+    """
+
+    __slots__ = ('_bits', '_size')
+
+    def __init__(self, words):
+        self._size = max(64, len(words) * _BLOOM_BITS_PER_WORD)
+        bits = 0
+        for word in words:
+            for seed in _BLOOM_SEEDS:
+                bits |= 1 << (hash((seed, word)) % self._size)
+        self._bits = bits
+
+    def __contains__(self, word):
+        bits = self._bits
+        size = self._size
+        for seed in _BLOOM_SEEDS:
+            if not (bits >> (hash((seed, word)) % size)) & 1:
+                return False
+        return True
+
+
+def _bloom_for(charged_set):
+    bloom = _bloom_by_set.get(charged_set)
+    if bloom is None:
+        bloom = BloomFilter(charged_set)
+        _bloom_by_set[charged_set] = bloom
+    return bloom
+
+
+def _intern_charged(charged_set):
+    """Отображение "заряженное" слово -> целочисленный id.
+
+    Интернируется только заряженный словарь, а не весь словарный запас:
+    токен с id >= 0 заряжен по построению, и отдельный булев массив
+    is_charged по словарю не нужен.
+    """
+    charged_ids = _charged_ids_by_set.get(charged_set)
+    if charged_ids is None:
+        charged_ids = {word: index for index, word in enumerate(charged_set)}
+        _charged_ids_by_set[charged_set] = charged_ids
+    return charged_ids
+
+
+def _tokens_to_ids(article_words, charged_ids):
+    return np.fromiter(
+        (charged_ids.get(word, -1) for word in article_words),
+        dtype=np.int32,
+        count=len(article_words),
+    )
+
+
+def init_morph(morph):
+    """Привязывает единственный экземпляр MorphAnalyzer к кэшу нормальных форм."""
+    global _morph
+    if _morph is not morph:
+        _morph = morph
+        _normal_forms.clear()
+
+
+def _raw_normal_form(word):
+    """Нормальная форма без построения Parse-namedtuple'ов.
+
+    Повторяет конвейер MorphAnalyzer.parse по сырым кортежам
+    анализаторов; word должен быть в нижнем регистре.
+    """
+    parses = []
+    seen = set()
+    for analyzer, is_terminal in _morph._units:
+        parses.extend(analyzer.parse(word, word, seen))
+        if is_terminal and parses:
+            break
+
+    if _morph.prob_estimator is not None:
+        parses = _morph.prob_estimator.apply_to_parses(word, word, parses)
+
+    if not parses:
+        return _morph.parse(word)[0].normal_form
+
+    return parses[0][2]
+
+
+def _normal_form(word):
+    lemma = _normal_forms.get(word)
+    if lemma is None:
+        lemma = _raw_normal_form(word)
+        if len(_normal_forms) < _NORMAL_FORM_CACHE_SIZE:
+            _normal_forms[word] = lemma
+            # Лемма сама себе нормальная форма: лемматизация уже
+            # лемматизированных слов становится бесплатной.
+            _normal_forms.setdefault(lemma, lemma)
+    return lemma
+
+
+_WORD_RE = re.compile(r'[\w-]+')
+
+
+def _split_by_words_sync(morph, text):
+    init_morph(morph)
+    if text_tools_c is not None:
+        return text_tools_c.split_by_words(morph, text)
     words = []
-    for word in text.split():
-        cleaned_word = _clean_word(word)
-        normalized_word = morph.parse(cleaned_word)[0].normal_form
+    cache_get = _normal_forms.get
+    # Один C-проход str.lower по всему тексту вместо lower() на токен;
+    # заодно уменьшается пространство ключей кэша лемм.
+    for word in _WORD_RE.findall(text.lower()):
+        # Повторы внутри статьи попадают в кэш без вызова _normal_form.
+        normalized_word = cache_get(word) or _normal_form(word)
         if len(normalized_word) > 2 or normalized_word == 'не':
             words.append(normalized_word)
-        await asyncio.sleep(0)
     return words
 
 
+async def split_by_words(morph, text):
+    """Учитывает знаки пунктуации, регистр и словоформы, выкидывает предлоги.
+
+    CPU-часть уходит в thread-пул, чтобы не блокировать event loop;
+    горячий путь сервера идёт через процессный пул в time_measurement.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, _split_by_words_sync, morph, text)
+
+
 def calculate_jaundice_rate(article_words, charged_words):
-    """Расчитывает желтушность текста, принимает список "заряженных" слов и ищет их внутри article_words."""
+    """Расчитывает желтушность текста, принимает список "заряженных" слов и ищет их внутри article_words.
+
+    charged_words — любой контейнер с поддержкой `in`; frozenset проходит
+    без копирования, список конвертируется в хэш-таблицу один раз за вызов.
+    """
 
     if not article_words:
         return 0.0
 
-    found_charged_words = [
-        word for word in article_words if word in set(charged_words)]
+    charged_set = frozenset(charged_words)
+
+    if np is not None:
+        # Токены лежат одним непрерывным int32-буфером: подсчёт — это
+        # одна редукция по массиву, без Python-объектов в цикле.
+        charged_ids = _intern_charged(charged_set)
+        ids = _tokens_to_ids(article_words, charged_ids)
+        if numba is not None:
+            found_charged_words = _count_charged(ids)
+        else:
+            found_charged_words = int((ids >= 0).sum())
+    else:
+        bloom = _bloom_for(charged_set)
+        found_charged_words = sum(
+            1 for word in article_words
+            if word in bloom and word in charged_set)
 
-    score = len(found_charged_words) / len(article_words) * 100
+    score = found_charged_words / len(article_words) * 100
 
     return round(score, 2)
@@ -0,0 +1,58 @@
+# cython: language_level=3
+"""Слитая C-версия конвейера токенизация → лемматизация → оценка.
+
+Запасной вариант для окружений без Numba: собирается через setup.py;
+split_by_words подхватывается text_tools._split_by_words_sync
+автоматически, score — точка входа для прямых вызовов.
+"""
+
+import re
+
+_WORD_RE = re.compile(r'[\w-]+')
+
+# Тот же предел, что и _NORMAL_FORM_CACHE_SIZE на Python-стороне.
+cdef Py_ssize_t _LEMMA_CACHE_SIZE = 200000
+
+cdef dict _lemma_cache = {}
+
+
+cpdef list split_by_words(object morph, str text):
+    """Типизированная версия text_tools._split_by_words_sync."""
+    cdef list words = []
+    cdef str word
+    cdef object lemma
+    parse = morph.parse
+
+    for word in _WORD_RE.findall(text.lower()):
+        lemma = _lemma_cache.get(word)
+        if lemma is None:
+            lemma = parse(word)[0].normal_form
+            if len(_lemma_cache) < _LEMMA_CACHE_SIZE:
+                _lemma_cache[word] = lemma
+        if len(<str>lemma) > 2 or lemma == 'не':
+            words.append(lemma)
+    return words
+
+
+cpdef tuple score(str text, frozenset charged_set, object morph):
+    """Возвращает (желтушность, количество значимых слов) одним проходом."""
+    cdef Py_ssize_t total = 0
+    cdef Py_ssize_t hits = 0
+    cdef str word
+    cdef object lemma
+    parse = morph.parse
+
+    for word in _WORD_RE.findall(text.lower()):
+        lemma = _lemma_cache.get(word)
+        if lemma is None:
+            lemma = parse(word)[0].normal_form
+            if len(_lemma_cache) < _LEMMA_CACHE_SIZE:
+                _lemma_cache[word] = lemma
+        if len(<str>lemma) > 2 or lemma == 'не':
+            total += 1
+            if lemma in charged_set:
+                hits += 1
+
+    if total == 0:
+        return 0.0, 0
+    return round(hits * 100.0 / total, 2), total
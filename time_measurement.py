@@ -1,22 +1,59 @@
 import asyncio
-import contextlib
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 
-from async_timeout import timeout
+try:
+    from asyncio import timeout  # Python >= 3.11
+except ImportError:
+    from async_timeout import timeout
 
-from text_tools import split_by_words
+import text_tools
 
 
-@contextlib.asynccontextmanager
-async def measure_exec_time(morph, text, to=3):
-    start_time = time.monotonic()
-    article_words = None
-    error = None
-    try:
-        async with timeout(to):
-            article_words = await split_by_words(morph, text)
-    except asyncio.TimeoutError as err:
-        error = err
-    finally:
-        end_time = time.monotonic() - start_time
-        yield end_time, article_words, error
+_analysis_pool = None
+
+
+def get_analysis_pool():
+    global _analysis_pool
+    if _analysis_pool is None:
+        _analysis_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            initializer=text_tools.init_worker_morph,
+        )
+    return _analysis_pool
+
+
+class measure_exec_time:
+    """Замеряет время разбора текста, отдаёт (время, слова, ошибка).
+
+    Обычный класс с __aenter__/__aexit__ вместо @asynccontextmanager:
+    на каждую статью не создаётся генератор и не выполняются два
+    send()-перехода.
+    """
+
+    __slots__ = ('morph', 'text', 'to')
+
+    def __init__(self, morph, text, to=3):
+        self.morph = morph
+        self.text = text
+        self.to = to
+
+    async def __aenter__(self):
+        start_time = time.monotonic()
+        article_words = None
+        error = None
+        try:
+            async with timeout(self.to):
+                loop = asyncio.get_running_loop()
+                article_words = await loop.run_in_executor(
+                    get_analysis_pool(),
+                    text_tools.analyze_text,
+                    self.text,
+                )
+        except asyncio.TimeoutError as err:
+            error = err
+        return time.monotonic() - start_time, article_words, error
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return False